@@ -11,25 +11,43 @@ Features:
 
 import json
 import asyncio
+import atexit
+import logging
+import logging.handlers
+import queue
 import re
 import random
 import signal
 import os
+import sys
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
-from dataclasses import dataclass, field, asdict
-from playwright.async_api import async_playwright, Page, BrowserContext, TimeoutError as PlaywrightTimeoutError
+from urllib.parse import quote_plus
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Route, TimeoutError as PlaywrightTimeoutError
 
 # For Excel export
 try:
     from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
     from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+    from openpyxl.utils import get_column_letter
     OPENPYXL_AVAILABLE = True
 except ImportError:
     OPENPYXL_AVAILABLE = False
     print("⚠️ openpyxl not installed. Run: pip install openpyxl")
 
+# For fast JSON serialization (optional, fallback về json chuẩn)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # For Vietnamese character removal
 try:
     from unidecode import unidecode
@@ -65,18 +83,334 @@ except ImportError:
         'Ý': 'Y', 'Ỳ': 'Y', 'Ỷ': 'Y', 'Ỹ': 'Y', 'Ỵ': 'Y',
         'Đ': 'D'
     }
+    # Bảng translate build 1 lần: bỏ dấu trong 1 lượt quét thay vì ~130 lần str.replace
+    _VIET_TABLE = str.maketrans(VIETNAMESE_MAP)
 
 
 # ===== CONFIGURATION =====
 STATE_DIR = Path("crawl_state")
 OUTPUT_DIR = Path("output")
+PROFILE_DIR = Path(".gmaps_profile")  # Browser profile (cookies, consent, cache)
+MAPS_SEARCH_URL = "https://www.google.com/maps/search/{}"
+
+# JSON output: compact mặc định, set GMAPS_JSON_INDENT=1 để pretty-print khi debug
+JSON_PRETTY = bool(os.environ.get("GMAPS_JSON_INDENT"))
+
+
+def _json_dumps_bytes(obj, pretty: bool = False) -> bytes:
+    """Serialize JSON ra UTF-8 bytes (orjson nếu có); compact trừ khi pretty=True"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _json_loads(data: Union[bytes, str]):
+    """Parse JSON từ bytes/str (orjson nếu có)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# ===== LOGGING =====
+# Log của scraper đi qua QueueHandler: coroutine chỉ enqueue record, việc ghi ra
+# stderr do thread của QueueListener làm, không chặn event loop.
+logger = logging.getLogger("google_maps_scraper")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler(sys.stderr)
+_log_stream_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# ===== PRECOMPILED PATTERNS =====
+# Pattern cho số điện thoại Việt Nam (thử lần lượt theo thứ tự)
+# 3 dạng số điện thoại gộp thành 1 alternation: quét text 1 lần thay vì 3 lần
+_PHONE_RE = re.compile(
+    r'(?:\+84|84|0)[\s.-]?\d{1,4}[\s.-]?\d{3}[\s.-]?\d{3,4}'
+    r'|(?:\+84|84|0)\d{9,10}'
+    r'|\b\d{10,11}\b'
+)
+_HAS_DIGIT_RE = re.compile(r'\d')
+_URL_RE = re.compile(r'https?://[^\s\"\',<>]+')
+_DOMAIN_RE = re.compile(r'(?:www\.)?[a-zA-Z0-9-]+\.[a-zA-Z]{2,}(?:\.[a-zA-Z]{2,})?')
+_CLEAN_RE = re.compile(r'[^\d+]')
+
+# Dùng cho sanitize_query_to_filename
+_NONALNUM_RE = re.compile(r'[^a-z0-9]+')
+_MULTI_US_RE = re.compile(r'_+')
+
+# Resource không ảnh hưởng tới text cần lấy -> chặn để tiết kiệm bandwidth/RAM
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+# ggpht.com: ảnh review/user; /maps/vt: map tiles (kể cả vector tiles tải qua fetch)
+_BLOCKED_URL_PARTS = (
+    'doubleclick', 'googleadservices', 'google-analytics', 'gstatic.com/images',
+    'ggpht.com', '/maps/vt',
+)
+
+# Tên thành phố dùng để nhận diện dòng địa chỉ
+_CITIES = frozenset({'Hà Nội', 'TP.HCM', 'Đà Nẵng', 'Cần Thơ', 'Hải Phòng', 'Việt Nam'})
+_PANEL_TEXT_CITIES = _CITIES | {'TP HCM', 'Sài Gòn'}
+_CITY_RE = re.compile('|'.join(map(re.escape, sorted(_CITIES))))
+_PANEL_TEXT_CITY_RE = re.compile('|'.join(map(re.escape, sorted(_PANEL_TEXT_CITIES))))
+# Text có các token này là rating/giờ mở cửa chứ không phải địa chỉ
+_ADDR_BLOCK_RE = re.compile('|'.join(map(re.escape, ('★', 'đánh giá', 'rating', 'Mở cửa', 'Đóng cửa'))))
+
+# Prefix trong aria-label của nút địa chỉ / giờ mở cửa
+_ARIA_ADDR_RE = re.compile(r'Address:|Địa chỉ:')
+_HOURS_PREFIX_RE = re.compile(r'Hours:|Giờ:|Opening hours:|Thời gian mở cửa:')
+_HOURS_CHAR_TABLE = str.maketrans({'⋅': '•'})
+
+# Detail panel đã có dữ liệu khi xuất hiện 1 trong các phần tử này
+_PANEL_READY_SELECTOR = 'button[data-item-id*="phone"], button[data-item-id*="address"], div.rogA2c'
+
+# Text báo hiệu giờ mở cửa trong detail panel
+_HOURS_INDICATORS = ('Open', 'Closes', 'Opens', 'Mở cửa', 'Đóng cửa', '24 hours', '24 giờ')
+_HOURS_IND_RE = re.compile('|'.join(map(re.escape, _HOURS_INDICATORS)))
+
+# Scrollable container của danh sách kết quả, theo thứ tự ưu tiên
+_SCROLLABLE_SELECTORS = (
+    'div[role="feed"]',
+    'div.m6QErb',  # Class name có thể thay đổi
+    '[aria-label*="Results"]',
+)
+
+# Link tới trang chi tiết của business trên feed, theo thứ tự ưu tiên
+_PLACE_LINK_SELECTORS = (
+    'a.hfpxzc',  # Link chính của mỗi business (phổ biến nhất)
+    'a[href*="/maps/place/"]',  # Fallback
+)
+
+# ===== IN-PAGE SCRIPTS =====
+# Lấy href của mọi link theo selector đầu tiên có kết quả.
+_PLACE_HREFS_JS = '''
+(selectors) => {
+    for (const sel of selectors) {
+        const links = document.querySelectorAll(sel);
+        if (links.length) {
+            return {selector: sel, hrefs: Array.from(links, (a) => a.getAttribute('href'))};
+        }
+    }
+    return {selector: null, hrefs: []};
+}
+'''
+
+# Trả về element đầu tiên khớp theo thứ tự selector (null nếu chưa có).
+# Dùng với wait_for_function để chờ và chọn trong 1 round-trip.
+_FIRST_MATCH_JS = '''
+(selectors) => {
+    for (const sel of selectors) {
+        const el = document.querySelector(sel);
+        if (el) return el;
+    }
+    return null;
+}
+'''
+
+# Scroll feed tới khi số kết quả không tăng sau maxStable lần liên tiếp.
+# Gọi trên element handle của scrollable container. Sau mỗi lần scroll chờ
+# MutationObserver báo có thêm kết quả (tối đa waitMs) thay vì sleep cố định.
+_SCROLL_FEED_JS = '''
+async (feed, {maxAttempts, waitMs, maxStable}) => {
+    const countItems = () => {
+        for (const sel of ['a[href*="/maps/place/"]', 'div[role="article"]', 'a.hfpxzc']) {
+            const n = document.querySelectorAll(sel).length;
+            if (n) return n;
+        }
+        return 0;
+    };
+    const nextChange = (prev) => new Promise((resolve) => {
+        const done = () => {
+            obs.disconnect();
+            clearTimeout(timer);
+            resolve();
+        };
+        const obs = new MutationObserver(() => {
+            if (countItems() > prev) done();
+        });
+        obs.observe(feed, {childList: true, subtree: true});
+        const timer = setTimeout(done, waitMs);
+    });
+    let prev = countItems(), stable = 0, scrolls = 0;
+    for (let i = 0; i < maxAttempts; i++) {
+        const changed = nextChange(prev);
+        feed.scrollBy(0, feed.scrollHeight);
+        scrolls++;
+        await changed;
+        const n = countItems();
+        if (n > prev) {
+            prev = n;
+            stable = 0;
+        } else if (++stable >= maxStable) {
+            break;
+        }
+    }
+    return {count: prev, scrolls};
+}
+'''
 
-# Global flags for control
-shutdown_requested = False
-pause_requested = False
+# Đọc thông tin có sẵn trên từng card của search feed.
+_FEED_CARDS_JS = '''
+() => Array.from(document.querySelectorAll('div[role="feed"] > div'), (card) => {
+    const link = card.querySelector('a.hfpxzc, a[href*="/maps/place/"]');
+    if (!link) return null;
+    const site = card.querySelector('a[data-value="Website"], a[aria-label*="Website"], a[aria-label*="Trang web"]');
+    return {
+        href: link.getAttribute('href'),
+        name: link.getAttribute('aria-label') || '',
+        text: card.innerText || '',
+        website: site ? site.getAttribute('href') : null,
+    };
+}).filter(Boolean)
+'''
+
+# Đọc dữ liệu chính của detail panel trong 1 round-trip: tên + aria-label
+# của các button data-item-id (đủ cho phần lớn business).
+_DETAIL_PANEL_JS = '''
+() => {
+    const q = (s) => document.querySelector(s);
+    const attr = (el, a) => (el && el.getAttribute(a)) || null;
+
+    // Tên - thử lần lượt nhiều selector
+    let name = null;
+    for (const sel of ['h1.DUwDvf', 'h1.fontHeadlineLarge', 'h1', 'div.fontHeadlineLarge span', '[role="main"] h1']) {
+        const el = q(sel);
+        const text = el ? (el.innerText || '').trim() : '';
+        if (text.length > 2) {
+            name = text;
+            break;
+        }
+    }
+
+    return {
+        name,
+        phoneAria: attr(q('button[data-item-id*="phone"]'), 'aria-label'),
+        addrAria: attr(q('button[data-item-id*="address"]'), 'aria-label'),
+        siteAria: attr(q('button[data-item-id*="authority"], button[data-item-id*="website"]'), 'aria-label'),
+        hoursAria: attr(q('button[data-item-id*="hours"]'), 'aria-label'),
+    };
+}
+'''
+
+# Dữ liệu cho các cách fallback, chỉ đọc những field còn thiếu.
+# Tham số: {phone, address, website, hours: bool, hoursPattern: source của _HOURS_IND_RE}
+_DETAIL_FALLBACK_JS = '''
+({phone, address, website, hours, hoursPattern}) => {
+    // Detail panel nằm trong [role="main"]: query trong đó thay vì cả document
+    const main = document.querySelector('[role="main"]');
+    const root = main || document;
+    const q = (s) => root.querySelector(s);
+    const texts = (s) => Array.from(root.querySelectorAll(s), (el) => el.innerText || '');
+    const data = {};
+
+    if (phone) {
+        const tel = q('a[href^="tel:"]');
+        data.tel = tel ? tel.getAttribute('href') : null;
+        data.phoneLabels = Array.from(
+            root.querySelectorAll('button[aria-label*="Phone"], button[aria-label*="Điện thoại"]'),
+            (el) => el.getAttribute('aria-label') || ''
+        );
+        // Gộp text các section để Python chỉ scan regex 1 lần;
+        // ' | ' ngăn regex số điện thoại khớp xuyên qua 2 section
+        data.sectionText = texts('div.rogA2c').join(' | ');
+    }
+
+    if (address) {
+        data.bodyTexts = texts('div.fontBodyMedium');
+        data.panelText = main ? main.innerText : null;
+    }
+
+    if (website) {
+        data.links = main ? Array.from(main.querySelectorAll('a[href^="http"]'), (a) => a.getAttribute('href') || '') : [];
+    }
+
+    // Giờ mở cửa - parent text của div đầu tiên chứa indicator
+    if (hours) {
+        data.hoursText = null;
+        const hoursRe = new RegExp(hoursPattern);
+        for (const div of root.querySelectorAll('div.fontBodyMedium, div.fontBodySmall')) {
+            const text = (div.innerText || '').trim();
+            if (hoursRe.test(text)) {
+                const parentText = div.parentElement ? (div.parentElement.innerText || '').trim() : '';
+                if (parentText.length > 3) {
+                    data.hoursText = parentText;
+                    break;
+                }
+            }
+        }
+    }
+
+    return data;
+}
+'''
+
+# Điều khiển crawl: Event thay cho cờ global để code crawl await thay vì busy-poll
+# Event được tạo trong event loop đang chạy (xem _init_control_events), không tạo lúc import:
+# Python 3.9 gắn Event vào loop lúc khởi tạo, khác với loop của asyncio.run()
+pause_event: Optional[asyncio.Event] = None  # set = đang chạy, clear = đang pause
+shutdown_event: Optional[asyncio.Event] = None
+_control_loop: Optional[asyncio.AbstractEventLoop] = None
 save_requested = False
 
 
+def _init_control_events() -> None:
+    """Tạo pause_event/shutdown_event cho event loop đang chạy (giữ nguyên nếu đã tạo)"""
+    global pause_event, shutdown_event, _control_loop
+    
+    loop = asyncio.get_running_loop()
+    if _control_loop is loop:
+        return
+    
+    pause_event = asyncio.Event()
+    pause_event.set()
+    shutdown_event = asyncio.Event()
+    _control_loop = loop
+
+
+async def _wait_if_paused() -> None:
+    """Chờ (không tốn CPU) tới khi resume hoặc có yêu cầu dừng"""
+    _init_control_events()
+    if pause_event.is_set() or shutdown_event.is_set():
+        return
+    
+    waiters = [asyncio.ensure_future(pause_event.wait()), asyncio.ensure_future(shutdown_event.wait())]
+    try:
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters:
+            waiter.cancel()
+
+
+async def _run_unless_shutdown(aw) -> bool:
+    """
+    Chạy awaitable, huỷ ngay nếu có yêu cầu dừng trong lúc chờ
+    
+    Returns:
+        True nếu awaitable chạy xong, False nếu bị huỷ do shutdown
+    """
+    _init_control_events()
+    task = asyncio.ensure_future(aw)
+    stopper = asyncio.ensure_future(shutdown_event.wait())
+    try:
+        await asyncio.wait([task, stopper], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stopper.cancel()
+        if not task.done():
+            task.cancel()
+            # cancel() chỉ là yêu cầu huỷ: chờ task kết thúc hẳn rồi mới xét kết quả
+            await asyncio.gather(task, return_exceptions=True)
+    
+    if task.cancelled():
+        return False
+    task.result()  # raise lại exception của awaitable (vd. timeout)
+    return True
+
+
 class KeyboardController:
     """
     Non-blocking keyboard listener for interactive terminal control.
@@ -88,64 +422,98 @@ class KeyboardController:
         self.thread: Optional[asyncio.Task] = None
         self._old_settings = None
         
+    def _enter_cbreak(self) -> None:
+        """Chuyển terminal sang cbreak mode 1 lần cho cả phiên (Unix only)."""
+        try:
+            import termios
+            import tty
+        except ImportError:
+            return
+        
+        try:
+            fd = sys.stdin.fileno()
+            self._old_settings = termios.tcgetattr(fd)
+            tty.setcbreak(fd)
+        except (termios.error, OSError, ValueError):
+            # stdin không phải TTY: đọc bình thường
+            self._old_settings = None
+    
+    def _restore_terminal(self) -> None:
+        """Khôi phục terminal settings đã lưu khi vào cbreak mode."""
+        if self._old_settings is None:
+            return
+        
+        import termios
+        try:
+            termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, self._old_settings)
+        except (termios.error, OSError, ValueError):
+            pass
+        self._old_settings = None
+    
+    @contextmanager
+    def suspended(self) -> Iterator[None]:
+        """
+        Tạm trả terminal về mode ban đầu (echo, backspace) cho input().
+        input() chặn event loop nên listener không đọc mất ký tự trong lúc này.
+        """
+        was_cbreak = self._old_settings is not None
+        self._restore_terminal()
+        try:
+            yield
+        finally:
+            if was_cbreak and self.running:
+                self._enter_cbreak()
+    
     def _get_char_non_blocking(self) -> Optional[str]:
         """Get a character from stdin without blocking (Unix only)."""
-        import sys
         import select
         
-        # Check if there's input available
+        # Terminal đã ở cbreak mode từ listen(), chỉ cần select + read
         if select.select([sys.stdin], [], [], 0)[0]:
-            try:
-                import termios
-                import tty
-                
-                fd = sys.stdin.fileno()
-                old_settings = termios.tcgetattr(fd)
-                try:
-                    tty.setraw(fd)
-                    ch = sys.stdin.read(1)
-                finally:
-                    termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-                return ch
-            except (ImportError, termios.error):
-                return sys.stdin.read(1)
+            return sys.stdin.read(1)
         return None
     
     async def listen(self) -> None:
         """Listen for keyboard input in async loop."""
-        global shutdown_requested, pause_requested, save_requested
+        global save_requested
         
+        _init_control_events()
         self.running = True
+        self._enter_cbreak()
         
-        while self.running:
-            try:
-                char = self._get_char_non_blocking()
-                if char:
-                    char_lower = char.lower()
-                    
-                    if char_lower == 'p':
-                        pause_requested = not pause_requested
-                        if pause_requested:
-                            print("\n   ⏸️  PAUSED - Nhấn [P] để tiếp tục...")
-                        else:
-                            print("\n   ▶️  RESUMED - Tiếp tục crawl...")
-                    
-                    elif char_lower == 's':
-                        save_requested = True
-                        print("\n   💾 Save requested...")
+        try:
+            while self.running:
+                try:
+                    char = self._get_char_non_blocking()
+                    if char:
+                        char_lower = char.lower()
+                        
+                        if char_lower == 'p':
+                            if pause_event.is_set():
+                                pause_event.clear()
+                                print("\n   ⏸️  PAUSED - Nhấn [P] để tiếp tục...")
+                            else:
+                                pause_event.set()
+                                print("\n   ▶️  RESUMED - Tiếp tục crawl...")
+                        
+                        elif char_lower == 's':
+                            save_requested = True
+                            print("\n   💾 Save requested...")
+                        
+                        elif char_lower == 'q':
+                            shutdown_event.set()
+                            print("\n   🛑 Quit requested - Đang lưu và thoát...")
+                            break
+                        
+                        elif char_lower == 'h':
+                            self.print_help()
                     
-                    elif char_lower == 'q':
-                        shutdown_requested = True
-                        print("\n   🛑 Quit requested - Đang lưu và thoát...")
-                        break
+                    await asyncio.sleep(0.2)  # Check every 200ms
                     
-                    elif char_lower == 'h':
-                        self.print_help()
-                
-                await asyncio.sleep(0.1)  # Check every 100ms
-                
-            except Exception:
-                await asyncio.sleep(0.5)
+                except Exception:
+                    await asyncio.sleep(0.5)
+        finally:
+            self._restore_terminal()
     
     def print_help(self) -> None:
         """Print help menu."""
@@ -176,6 +544,7 @@ def print_controls_banner() -> None:
     print("─" * 60 + "\n")
 
 
+@lru_cache(maxsize=1024)
 def sanitize_query_to_filename(query: str) -> str:
     """
     Convert a query string to a valid filename.
@@ -187,33 +556,99 @@ def sanitize_query_to_filename(query: str) -> str:
     Returns:
         A sanitized filename-safe string
     """
+    # Fast path: query chỉ gồm chữ/số ASCII và khoảng trắng thì không cần unidecode/regex
+    if query.isascii() and all(c.isalnum() or c == ' ' for c in query):
+        return '_'.join(query.lower().split()) or "query"
+    
     # First, convert Vietnamese characters to ASCII
     if UNIDECODE_AVAILABLE:
         ascii_text = unidecode(query)
     else:
         # Fallback: use manual mapping
-        ascii_text = query
-        for viet_char, ascii_char in VIETNAMESE_MAP.items():
-            ascii_text = ascii_text.replace(viet_char, ascii_char)
+        ascii_text = query.translate(_VIET_TABLE)
     
     # Convert to lowercase
     ascii_text = ascii_text.lower()
     
     # Replace spaces and special chars with underscore
-    ascii_text = re.sub(r'[^a-z0-9]+', '_', ascii_text)
+    ascii_text = _NONALNUM_RE.sub('_', ascii_text)
     
     # Remove leading/trailing underscores
     ascii_text = ascii_text.strip('_')
     
     # Collapse multiple underscores
-    ascii_text = re.sub(r'_+', '_', ascii_text)
+    ascii_text = _MULTI_US_RE.sub('_', ascii_text)
     
     return ascii_text or "query"
 
 
+@lru_cache(maxsize=1024)
+def maps_search_url(query: str) -> str:
+    """URL trang kết quả tìm kiếm Google Maps cho query"""
+    return MAPS_SEARCH_URL.format(quote_plus(query))
+
+
+class _SaveWorker:
+    """
+    Background thread ghi state files ra đĩa.
+    Mỗi file chỉ giữ snapshot mới nhất (latest-wins): save dồn dập thì chỉ
+    ghi bản cuối, bản cũ chưa kịp ghi bị bỏ.
+    """
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending: Dict[Path, Dict] = {}
+        self._busy = False
+        self._thread: Optional[threading.Thread] = None
+    
+    def submit(self, path: Path, data: Dict) -> None:
+        """Đưa snapshot vào hàng đợi ghi và trả về ngay."""
+        with self._cond:
+            self._pending[path] = data
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="state-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+    
+    def flush(self) -> None:
+        """Chờ tới khi mọi snapshot đang chờ đã được ghi xong."""
+        with self._cond:
+            while self._pending or self._busy:
+                self._cond.wait()
+    
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                path, data = self._pending.popitem()
+                self._busy = True
+            
+            try:
+                # Ghi ra file tạm rồi os.replace: Ctrl+C giữa chừng không làm hỏng state cũ
+                tmp_file = path.with_suffix(path.suffix + ".tmp")
+                tmp_file.write_bytes(_json_dumps_bytes(data))
+                os.replace(tmp_file, path)
+            except Exception as e:
+                print(f"   ⚠️ Error saving state {path}: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+
+_save_worker = _SaveWorker()
+atexit.register(_save_worker.flush)
+
+
 @dataclass
 class CrawlState:
-    """Manages the crawl state for resume functionality."""
+    """
+    Manages the crawl state for resume functionality.
+    Header (query, urls, index...) lưu ở {filename}_state.json; results được
+    append từng dòng vào {filename}_results.jsonl nên save() không phải ghi lại
+    toàn bộ results mỗi lần.
+    """
     query: str
     filename: str
     urls: List[str] = field(default_factory=list)
@@ -221,43 +656,112 @@ class CrawlState:
     results: List[Dict[str, str]] = field(default_factory=list)
     last_updated: str = ""
     completed: bool = False
+    # results file trên đĩa đã khớp với self.results chưa. False (state mới hoặc
+    # vừa load) thì lần ghi đầu tiên rewrite file từ self.results: bỏ dòng cũ của
+    # run trước / dòng thừa sau header cuối. Chỉ load để đọc thì không đụng file.
+    _results_synced: bool = field(default=False, init=False, repr=False, compare=False)
+    
+    @property
+    def state_file(self) -> Path:
+        return STATE_DIR / f"{self.filename}_state.json"
+    
+    @property
+    def results_file(self) -> Path:
+        return STATE_DIR / f"{self.filename}_results.jsonl"
+    
+    def add_result(self, result: Dict[str, str]) -> None:
+        """Thêm 1 kết quả và append ngay vào results file (O(1), không rewrite)"""
+        self._sync_results_file()
+        self.results.append(result)
+        with open(self.results_file, 'ab') as f:
+            f.write(_json_dumps_bytes(result) + b"\n")
+    
+    def _rewrite_results_file(self) -> None:
+        """Ghi lại results file từ self.results (chỉ dùng khi cần sửa file)"""
+        STATE_DIR.mkdir(exist_ok=True)
+        tmp_file = self.results_file.with_suffix(".jsonl.tmp")
+        with open(tmp_file, 'wb') as f:
+            for result in self.results:
+                f.write(_json_dumps_bytes(result) + b"\n")
+        os.replace(tmp_file, self.results_file)
+        self._results_synced = True
+    
+    def _sync_results_file(self) -> None:
+        """Rewrite results file 1 lần trước lần ghi đầu tiên của state này"""
+        if not self._results_synced:
+            self._rewrite_results_file()
     
     def save(self) -> None:
-        """Save current state to JSON file."""
+        """
+        Save state header to JSON file.
+        Chỉ snapshot trên thread hiện tại; việc ghi đĩa do _save_worker làm.
+        """
         STATE_DIR.mkdir(exist_ok=True)
-        state_file = STATE_DIR / f"{self.filename}_state.json"
+        self._sync_results_file()
         
         self.last_updated = datetime.now().isoformat()
         
-        with open(state_file, 'w', encoding='utf-8') as f:
-            json.dump(asdict(self), f, ensure_ascii=False, indent=2)
+        # result_count: số dòng đầu của results file đã khớp với header này
+        _save_worker.submit(self.state_file, {
+            'query': self.query,
+            'filename': self.filename,
+            'urls': list(self.urls),
+            'current_index': self.current_index,
+            'result_count': len(self.results),
+            'last_updated': self.last_updated,
+            'completed': self.completed,
+        })
         
-        print(f"   💾 State saved: {state_file}")
+        print(f"   💾 State saved: {self.state_file}")
+    
+    @staticmethod
+    def flush() -> None:
+        """Block until all pending state writes are on disk."""
+        _save_worker.flush()
     
     @classmethod
     def load(cls, filename: str) -> Optional['CrawlState']:
-        """Load state from JSON file if exists."""
+        """Load state header from JSON file and results from JSONL if exists."""
         state_file = STATE_DIR / f"{filename}_state.json"
         
+        # Đảm bảo đọc được bản save mới nhất
+        _save_worker.flush()
+        
         if not state_file.exists():
             return None
         
         try:
-            with open(state_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = _json_loads(state_file.read_bytes())
             
-            return cls(
+            state = cls(
                 query=data['query'],
                 filename=data['filename'],
                 urls=data.get('urls', []),
                 current_index=data.get('current_index', 0),
-                results=data.get('results', []),
                 last_updated=data.get('last_updated', ''),
                 completed=data.get('completed', False)
             )
-        except (json.JSONDecodeError, KeyError) as e:
+        except (ValueError, KeyError) as e:
+            # ValueError: JSONDecodeError của json/orjson, hoặc file không phải UTF-8
             print(f"   ⚠️ Error loading state: {e}")
             return None
+        
+        if 'result_count' not in data:
+            # State file kiểu cũ: results nằm trong JSON, chuyển sang JSONL
+            state.results = data.get('results', [])
+            state._rewrite_results_file()
+            return state
+        
+        # Chỉ lấy result_count dòng đầu (các dòng append sau lần save header cuối
+        # thuộc URL sẽ được crawl lại). Cắt trong bộ nhớ, không sửa file: crawl đang
+        # chạy có thể vẫn append vào file này (vd. khi chạy --status / --export).
+        results_file = state.results_file
+        if results_file.exists():
+            records = read_ndjson(results_file)
+            state.results = [record for _, record in zip(range(data['result_count']), records)]
+            records.close()
+        
+        return state
     
     @classmethod
     def find_existing(cls, query: str) -> Optional['CrawlState']:
@@ -269,13 +773,16 @@ class CrawlState:
         """Mark this crawl as completed."""
         self.completed = True
         self.save()
+        self.flush()
     
     def delete_state_file(self) -> None:
-        """Delete the state file after successful completion."""
-        state_file = STATE_DIR / f"{self.filename}_state.json"
-        if state_file.exists():
-            state_file.unlink()
-            print(f"   🗑️ State file deleted: {state_file}")
+        """Delete the state file and results file after successful completion."""
+        # Không để worker ghi lại file sau khi đã xóa
+        self.flush()
+        for path in (self.state_file, self.results_file):
+            if path.exists():
+                path.unlink()
+                print(f"   🗑️ State file deleted: {path}")
 
 
 def list_saved_states() -> List[Path]:
@@ -315,6 +822,32 @@ def export_from_state_files() -> None:
             print(f"\n⚠️ {filename}: Không có kết quả để export")
 
 
+# ===== EXCEL LAYOUT =====
+# (headers, fields, column widths) theo từng layout; không tính cột STT trong fields
+_EXCEL_LAYOUT_WITH_QUERY = (
+    ("STT", "Query", "Tên", "Điện thoại", "Địa chỉ", "Website", "Giờ mở cửa"),
+    ('query', 'name', 'phone', 'address', 'website', 'opening_hours'),
+    (6, 30, 40, 15, 60, 40, 30),
+)
+_EXCEL_LAYOUT_NO_QUERY = (
+    ("STT", "Tên", "Điện thoại", "Địa chỉ", "Website", "Giờ mở cửa"),
+    ('name', 'phone', 'address', 'website', 'opening_hours'),
+    (6, 40, 15, 60, 40, 30),
+)
+
+# Style objects tạo 1 lần khi import, dùng chung cho mọi cell của mọi lần export
+if OPENPYXL_AVAILABLE:
+    _HEADER_FONT = Font(bold=True, color="FFFFFF")
+    _HEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    _HEADER_ALIGN = Alignment(horizontal="center", vertical="center")
+    _THIN_BORDER = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+
 def save_to_excel(
     results: List[Dict[str, str]],
     query: str,
@@ -349,61 +882,32 @@ def save_to_excel(
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     excel_path = output_dir / f"{filename}_{timestamp}.xlsx"
     
-    # Create workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Results"
+    # Write-only workbook: stream từng row ra XML, không giữ cả worksheet trong RAM
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Results")
     
-    # Define headers
-    if include_query_col:
-        headers = ["STT", "Query", "Tên", "Điện thoại", "Địa chỉ", "Website", "Giờ mở cửa"]
-    else:
-        headers = ["STT", "Tên", "Điện thoại", "Địa chỉ", "Website", "Giờ mở cửa"]
+    headers, fields, column_widths = _EXCEL_LAYOUT_WITH_QUERY if include_query_col else _EXCEL_LAYOUT_NO_QUERY
     
-    # Header style
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center")
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
+    # Column widths phải set trước khi ghi row đầu tiên (write-only)
+    for col, width in enumerate(column_widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+    
+    def make_cell(value, header: bool = False) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.border = _THIN_BORDER
+        if header:
+            cell.font = _HEADER_FONT
+            cell.fill = _HEADER_FILL
+            cell.alignment = _HEADER_ALIGN
+        return cell
     
     # Write headers
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = thin_border
+    ws.append([make_cell(header, header=True) for header in headers])
     
     # Write data
-    for row, business in enumerate(results, 2):
-        ws.cell(row=row, column=1, value=row - 1).border = thin_border
-
-        if include_query_col:
-            ws.cell(row=row, column=2, value=business.get('query', '')).border = thin_border
-            ws.cell(row=row, column=3, value=business.get('name', '')).border = thin_border
-            ws.cell(row=row, column=4, value=business.get('phone', '')).border = thin_border
-            ws.cell(row=row, column=5, value=business.get('address', '')).border = thin_border
-            ws.cell(row=row, column=6, value=business.get('website', '')).border = thin_border
-            ws.cell(row=row, column=7, value=business.get('opening_hours', '')).border = thin_border
-        else:
-            ws.cell(row=row, column=2, value=business.get('name', '')).border = thin_border
-            ws.cell(row=row, column=3, value=business.get('phone', '')).border = thin_border
-            ws.cell(row=row, column=4, value=business.get('address', '')).border = thin_border
-            ws.cell(row=row, column=5, value=business.get('website', '')).border = thin_border
-            ws.cell(row=row, column=6, value=business.get('opening_hours', '')).border = thin_border
-    
-    # Adjust column widths
-    if include_query_col:
-        column_widths = [6, 30, 40, 15, 60, 40, 30]
-    else:
-        column_widths = [6, 40, 15, 60, 40, 30]
-    for col, width in enumerate(column_widths, 1):
-        ws.column_dimensions[ws.cell(row=1, column=col).column_letter].width = width
+    for stt, business in enumerate(results, 1):
+        values = (stt, *(business.get(key, '') for key in fields))
+        ws.append([make_cell(value) for value in values])
     
     # Save workbook
     wb.save(excel_path)
@@ -434,59 +938,311 @@ def save_combined_excel(
     return save_to_excel(combined, query="combined", output_dir=output_dir, include_query_col=True)
 
 
+# ===== TEXT PARSING HELPERS =====
+# Hàm thuần (text -> value) nên cache được: aria-label/dòng ngắn lặp lại giữa các chi nhánh.
+# Chỉ cache input ngắn; text dài (panelText, sectionText, card text) gần như luôn khác nhau,
+# cache vào chỉ giữ hàng nghìn chuỗi lớn trong bộ nhớ mà không bao giờ hit.
+
+def _extract_address_from_text(text: str) -> str:
+    """Extract địa chỉ từ một đoạn text dài"""
+    for line in text.split('\n'):
+        line = line.strip()
+        # Tìm dòng chứa tên thành phố và đủ dài
+        if len(line) > 15 and _PANEL_TEXT_CITY_RE.search(line):
+            # Loại bỏ các prefix không cần thiết
+            if ':' in line:
+                line = line.split(':', 1)[1].strip()
+            return line
+    
+    return "Chưa có thông tin"
+
+
+@lru_cache(maxsize=4096)
+def _extract_website(text: str) -> Optional[str]:
+    """Trích xuất website URL từ text"""
+    # Pre-test rẻ: không có "://" thì _URL_RE chắc chắn không khớp
+    m = _URL_RE.search(text) if '://' in text else None
+
+    if m:
+        url = m.group(0)
+        # Loại bỏ các URL của Google
+        if 'google.com' not in url and 'gstatic.com' not in url:
+            return url
+
+    # Nếu không tìm thấy http://, thử tìm domain pattern (cần có dấu '.')
+    if '.' not in text:
+        return None
+    m = _DOMAIN_RE.search(text)
+
+    if m:
+        domain = m.group(0)
+        # Thêm https:// nếu chưa có
+        if not domain.startswith(('http://', 'https://')):
+            return f'https://{domain}'
+        return domain
+    
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _extract_opening_hours(text: str) -> Optional[str]:
+    """Trích xuất thông tin giờ mở cửa từ text"""
+    # Làm sạch aria-label
+    # Thường có format: "Hours: Open ⋅ Closes 5 PM" hoặc "Giờ: Mở cửa ⋅ Đóng cửa 17:00"
+    
+    # Loại bỏ các prefix như "Hours:", "Giờ:", etc. (1 lượt regex, lấy phần sau prefix)
+    cleaned = _HOURS_PREFIX_RE.split(text, maxsplit=1)[-1].strip()
+    
+    # Nếu có nội dung hợp lệ
+    if len(cleaned) > 3:
+        # Làm sạch thêm các ký tự đặc biệt
+        cleaned = cleaned.translate(_HOURS_CHAR_TABLE).strip()
+        return cleaned
+    
+    return None
+
+
+def _extract_phone(text: str) -> Optional[str]:
+    """Trích xuất số điện thoại từ text (không cache, dùng cho text dài)"""
+    # Text không có chữ số (tên, nhãn...) thì bỏ qua alternation lớn
+    if not _HAS_DIGIT_RE.search(text):
+        return None
+    
+    # Match đầu tiên có độ dài hợp lệ sau chuẩn hóa (vẫn chỉ 1 lượt quét)
+    for m in _PHONE_RE.finditer(text):
+        # Làm sạch
+        phone = _CLEAN_RE.sub('', m.group(0))
+        
+        # Chuẩn hóa
+        if phone.startswith('+84'):
+            phone = '0' + phone[3:]
+        elif phone.startswith('84'):
+            phone = '0' + phone[2:]
+        
+        if 10 <= len(phone) <= 11:
+            return phone
+    
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _extract_phone_label(text: str) -> Optional[str]:
+    """_extract_phone có cache, chỉ dùng cho aria-label / href tel: / dòng ngắn"""
+    return _extract_phone(text)
+
+
+def _business_from_feed_card(card: Dict) -> Dict:
+    """Dựng business info từ dữ liệu 1 card của search feed (xem _FEED_CARDS_JS)"""
+    text = card.get('text') or ''
+    
+    website = card.get('website')
+    if website and ('google.com' in website or 'gstatic.com' in website):
+        website = None
+    
+    name = (card.get('name') or '').strip()
+    
+    # Xét từng dòng để regex số điện thoại không ăn sang dòng bên cạnh (vd "21:00\n0912...")
+    phone = None
+    address = None
+    opening_hours = None
+    for line_no, line in enumerate(text.split('\n')):
+        line = line.strip()
+        if not phone:
+            phone = _extract_phone_label(line)
+        if not opening_hours and _HOURS_IND_RE.search(line):
+            # Dòng giờ trên card thường kèm SĐT sau dấu "·" (vd "Mở cửa ⋅ Đóng cửa 21:00 · 0912 345 678")
+            opening_hours = line.split('·', 1)[0].strip().translate(_HOURS_CHAR_TABLE)
+        
+        # Địa chỉ: bỏ dòng tên (tên hay chứa tên thành phố), xét từng phần "Loại · Địa chỉ".
+        # Card thường chỉ có số nhà + đường, thiếu thành phố -> None để mở detail page
+        if address or line_no == 0 or line == name:
+            continue
+        for part in line.split('·'):
+            part = part.strip()
+            if len(part) > 15 and _PANEL_TEXT_CITY_RE.search(part) and not _ADDR_BLOCK_RE.search(part):
+                address = part
+                break
+    
+    return {
+        "name": name,
+        "phone": phone,
+        "address": address,
+        "website": website,
+        "opening_hours": opening_hours,
+    }
+
+
+async def block_heavy_resources(route: Route) -> None:
+    """Route handler: abort ảnh, font, CSS, media và tracker; cho qua phần còn lại."""
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(part in request.url for part in _BLOCKED_URL_PARTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
 class GoogleMapsScraper:
     """Scraper Google Maps sử dụng Playwright"""
     
-    def __init__(self, headless: bool = False, concurrent_tabs: int = 3):
+    def __init__(
+        self,
+        headless: bool = False,
+        concurrent_tabs: int = 3,
+        feed_complete_fields: Optional[Tuple[str, ...]] = ('phone', 'website', 'address'),
+        query_concurrency: int = 2,
+        profile_dir: Optional[Path] = PROFILE_DIR,
+    ):
         self.headless = headless
+        # Thư mục profile cho persistent context (None = context mới, không giữ cookies;
+        # cho phép nhiều process chạy song song vì Chromium khoá profile đang dùng)
+        self.profile_dir = profile_dir
         self.concurrent_tabs = concurrent_tabs
+        self.query_concurrency = query_concurrency  # Số query chạy song song trong run_searches
+        # Card trên feed có đủ các field này thì dùng luôn, không mở detail page
+        # (None = luôn mở detail page)
+        self.feed_complete_fields = feed_complete_fields
         self.max_scroll_attempts = 100  # Số lần scroll tối đa để load hết kết quả
         self.max_retries = 3  # Số lần retry khi timeout
-    
-    async def search_google_maps(self, query: str, page: Page, context: BrowserContext) -> List[Dict]:
+        self._page_pool: Optional[asyncio.Queue] = None  # Pool tabs tái sử dụng giữa các URL
+        self._live_tabs = 0  # Số tab còn dùng được của pool (0 = pool hỏng)
+        self._on_record: Optional[Callable[[Dict, Optional[str]], None]] = None  # Callback (business, query) cho mỗi business extract được
+        self.raw_records_path: Optional[Path] = None  # NDJSON của lần run_searches gần nhất
+        self._url_cache: Dict[str, Optional[Dict]] = {}  # URL (bỏ query string) -> business info
+        self._playwright = None  # Playwright driver khi dùng `async with GoogleMapsScraper(...)`
+        self._browser: Optional[Browser] = None  # Chỉ có khi profile_dir=None (context không persistent)
+        self._context: Optional[BrowserContext] = None  # Context dùng chung cho mọi query
+        self._by_name: Dict[str, Dict] = {}  # Business duy nhất theo tên (giữ bản gặp đầu tiên)
+    
+    @property
+    def unique_results(self) -> List[Dict]:
+        """Các business đã crawl, đã loại trùng theo tên (truyền thẳng cho save_results)"""
+        return list(self._by_name.values())
+    
+    def _record(self, business: Dict, query: Optional[str]) -> None:
+        """Ghi nhận 1 business vừa lấy được: dedupe theo tên + gọi _on_record"""
+        name = business.get('name')
+        if name and name not in self._by_name:
+            self._by_name[name] = business
+        if self._on_record:
+            self._on_record(business, query)
+    
+    async def __aenter__(self) -> 'GoogleMapsScraper':
+        """Khởi động browser + context + tab pool 1 lần, dùng lại cho mọi query"""
+        _init_control_events()
+        self._playwright = await async_playwright().start()
+        try:
+            self._context = await self._launch_context(self._playwright)
+            await self._open_page_pool(self._context)
+        except BaseException:
+            await self.__aexit__(None, None, None)
+            raise
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """Đóng tab pool, context và Playwright driver"""
+        await self._close_page_pool()
+        if self._context is not None:
+            await self._context.close()
+            self._context = None
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    async def _launch_context(self, playwright) -> BrowserContext:
+        """Mở context theo profile_dir: persistent hoặc context mới (đã gắn route chặn resource nặng)"""
+        logger.info("🌐 Đang khởi động browser...")
+        
+        # Launch với args tương tự batdongsan_final.py
+        launch_args = [
+            '--disable-blink-features=AutomationControlled',
+            '--disable-web-security',
+            '--no-sandbox',
+            '--disable-setuid-sandbox',
+        ]
+        context_options = dict(
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            viewport={"width": 1920, "height": 1080},
+            locale="vi-VN",
+            timezone_id="Asia/Ho_Chi_Minh",
+        )
+        
+        if self.profile_dir is None:
+            self._browser = await playwright.chromium.launch(headless=self.headless, args=launch_args)
+            context = await self._browser.new_context(**context_options)
+        else:
+            # Persistent context: cookies/consent/cache được giữ lại giữa các query và các lần chạy
+            context = await playwright.chromium.launch_persistent_context(
+                user_data_dir=str(self.profile_dir),
+                headless=self.headless,
+                args=launch_args,
+                **context_options,
+            )
+        await context.route("**/*", block_heavy_resources)
+        return context
+    
+    async def search_google_maps(
+        self,
+        query: str,
+        page: Optional[Page] = None,
+        context: Optional[BrowserContext] = None,
+    ) -> List[Dict]:
         """
         Tìm kiếm trên Google Maps và lấy danh sách kết quả
         
         Args:
             query: Từ khóa tìm kiếm
-            page: Playwright page instance
-            context: Browser context for multi-tab processing
+            page: Playwright page instance (None = mở tab mới trong context, đóng khi xong)
+            context: Browser context for multi-tab processing (None = context của `async with`)
             
         Returns:
             List các kết quả business
         """
-        from urllib.parse import quote_plus
+        if context is None:
+            context = self._context
+            if context is None:
+                raise RuntimeError("Cần truyền context hoặc dùng `async with GoogleMapsScraper(...)`")
+        _init_control_events()
+        
+        if page is None:
+            page = await context.new_page()
+            try:
+                return await self.search_google_maps(query, page, context)
+            finally:
+                await page.close()
         
-        encoded_query = quote_plus(query)
-        maps_url = f"https://www.google.com/maps/search/{encoded_query}"
+        maps_url = maps_search_url(query)
         
         try:
-            print(f"   🗺️  Đang truy cập Google Maps...")
-            await page.goto(maps_url, wait_until="domcontentloaded", timeout=60000)
+            logger.info(f"   🗺️  Đang truy cập Google Maps...")
+            # "commit": trả về ngay khi nhận response, wait_for_selector bên dưới mới là điều kiện sẵn sàng
+            await page.goto(maps_url, wait_until="commit", timeout=60000)
             
             # Đợi kết quả load với smart wait
-            print(f"   ⏳ Đang chờ kết quả Maps load...")
+            logger.info(f"   ⏳ Đang chờ kết quả Maps load...")
             try:
-                await page.wait_for_selector('div[role="feed"]', timeout=10000)
-                print(f"   ✅ Đã load được danh sách kết quả")
+                await page.wait_for_selector('div[role="feed"]', timeout=20000)
+                logger.info(f"   ✅ Đã load được danh sách kết quả")
             except:
-                print(f"   ⚠️ Không tìm thấy danh sách kết quả")
+                logger.warning(f"   ⚠️ Không tìm thấy danh sách kết quả")
                 return []
             
             # Scroll để load tất cả kết quả
             results_count = await self._scroll_to_load_all(page)
-            print(f"   📊 Tổng số kết quả sau khi scroll: {results_count}")
+            logger.info(f"   📊 Tổng số kết quả sau khi scroll: {results_count}")
             
             # Parse tất cả kết quả với multi-tab
-            businesses = await self._parse_all_results_with_tabs(page, context)
+            businesses = await self._parse_all_results_with_tabs(page, context, query)
             
             return businesses
             
         except PlaywrightTimeoutError:
-            print(f"   ⏱️ Timeout khi load Google Maps")
+            logger.info(f"   ⏱️ Timeout khi load Google Maps")
             return []
         except Exception as e:
-            print(f"   ❌ Lỗi: {type(e).__name__}: {e}")
+            logger.error(f"   ❌ Lỗi: {type(e).__name__}: {e}")
             return []
     
     async def _scroll_to_load_all(self, page: Page) -> int:
@@ -496,391 +1252,387 @@ class GoogleMapsScraper:
         Returns:
             Số lượng kết quả hiện tại
         """
-        print(f"   🔄 Đang scroll để load thêm kết quả...")
+        logger.info(f"   🔄 Đang scroll để load thêm kết quả...")
         
         # Selector cho scrollable container
-        # Google Maps có thể thay đổi, thử nhiều selector
-        scrollable_selectors = [
-            'div[role="feed"]',
-            'div.m6QErb',  # Class name có thể thay đổi
-            '[aria-label*="Results"]',
-        ]
-        
-        scrollable_elem = None
-        for selector in scrollable_selectors:
-            elem = await page.query_selector(selector)
-            if elem:
-                scrollable_elem = elem
-                print(f"      ✓ Tìm thấy scrollable container: {selector}")
-                break
+        # Google Maps có thể thay đổi, thử nhiều selector (theo thứ tự ưu tiên).
+        # Chờ + chọn container trong 1 lần gọi thay vì query lần lượt từng selector.
+        try:
+            handle = await page.wait_for_function(
+                _FIRST_MATCH_JS, arg=list(_SCROLLABLE_SELECTORS), timeout=10000
+            )
+            scrollable_elem = handle.as_element()
+        except PlaywrightTimeoutError:
+            scrollable_elem = None
         
         if not scrollable_elem:
-            print(f"      ⚠️ Không tìm thấy scrollable container")
+            logger.warning(f"      ⚠️ Không tìm thấy scrollable container")
             return 0
         
         try:
-            previous_count = 0
-            no_change_attempts = 0
-            
-            for i in range(self.max_scroll_attempts):
-                # Scroll xuống
-                await page.evaluate('''
-                    const scrollable = document.querySelector('div[role="feed"]');
-                    if (scrollable) {
-                        scrollable.scrollBy(0, scrollable.scrollHeight);
-                    }
-                ''')
-                
-                # Đợi load - giảm từ 3s xuống 1.5s
-                await asyncio.sleep(1.5)
-                
-                # Đếm số item
-                # Thử nhiều selector
-                items = []
-                for sel in ['a[href*="/maps/place/"]', 'div[role="article"]', 'a.hfpxzc']:
-                    items = await page.query_selector_all(sel)
-                    if items:
-                        break
-                
-                current_count = len(items)
-                
-                if current_count > previous_count:
-                    print(f"      ├─ Scroll {i+1}: {current_count} kết quả (+{current_count - previous_count})")
-                    previous_count = current_count
-                    no_change_attempts = 0
-                else:
-                    no_change_attempts += 1
-                    print(f"      ├─ Scroll {i+1}: {current_count} kết quả (không tăng)")
-                    
-                    if no_change_attempts >= 3:
-                        print(f"      └─ Đã load hết (không tăng sau 3 lần)")
-                        break
-            
-            return previous_count
+            # Toàn bộ vòng scroll chạy trong browser: 1 round-trip, dừng ngay khi số item ổn định
+            result = await scrollable_elem.evaluate(
+                _SCROLL_FEED_JS,
+                {'maxAttempts': self.max_scroll_attempts, 'waitMs': 1500, 'maxStable': 3},
+            )
+            logger.info(f"      └─ Đã load hết sau {result['scrolls']} lần scroll: {result['count']} kết quả")
+            return result['count']
             
         except Exception as e:
-            print(f"   ⚠️ Lỗi scroll: {e}")
+            logger.warning(f"   ⚠️ Lỗi scroll: {e}")
             return 0
     
-    async def _parse_all_results_with_tabs(self, page: Page, context: BrowserContext) -> List[Dict]:
+    async def _parse_all_results_with_tabs(
+        self, page: Page, context: BrowserContext, query: Optional[str] = None
+    ) -> List[Dict]:
         """
         Parse tất cả kết quả sử dụng multi-tab parallel processing
         
+        Args:
+            query: Query đang crawl (truyền kèm mỗi record cho _on_record)
+        
         Returns:
             List các business info
         """
         businesses = []
+        owns_pool = False
         
         try:
-            # Thu thập tất cả URLs từ search results
-            possible_selectors = [
-                'a.hfpxzc',  # Link chính của mỗi business (phổ biến nhất)
-                'a[href*="/maps/place/"]',  # Fallback
-            ]
+            # Thu thập tất cả URLs từ search results (1 round-trip)
+            found = await page.evaluate(_PLACE_HREFS_JS, list(_PLACE_LINK_SELECTORS))
+            if found['selector']:
+                logger.info(f"   ✅ Tìm thấy {len(found['hrefs'])} items với selector: {found['selector']}")
             
+            # Loại duplicates ngay khi thu thập
             urls = []
-            used_selector = None
-            
-            for selector in possible_selectors:
-                items = await page.query_selector_all(selector)
-                if items and len(items) > 0:
-                    used_selector = selector
-                    print(f"   ✅ Tìm thấy {len(items)} items với selector: {selector}")
-                    
-                    # Extract URLs
-                    for item in items:
-                        href = await item.get_attribute('href')
-                        if href and '/maps/place/' in href:
-                            urls.append(href)
-                    break
+            seen = set()
+            for href in found['hrefs']:
+                if href and '/maps/place/' in href and href not in seen:
+                    seen.add(href)
+                    urls.append(href)
             
             if not urls:
-                print(f"   ❌ Không tìm thấy business URLs!")
+                logger.error(f"   ❌ Không tìm thấy business URLs!")
                 # Debug: lưu HTML và screenshot
                 html_content = await page.content()
                 with open('debug_maps.html', 'w', encoding='utf-8') as f:
                     f.write(html_content)
                 await page.screenshot(path='debug_maps.png')
-                print(f"   💾 Đã lưu debug_maps.html và debug_maps.png")
+                logger.info(f"   💾 Đã lưu debug_maps.html và debug_maps.png")
                 return businesses
             
-            # Loại bỏ duplicates
-            urls = list(dict.fromkeys(urls))
-            
             # Giới hạn số lượng
             max_items = min(len(urls), 30)
             urls = urls[:max_items]
             
-            print(f"   📝 Sẽ crawl {len(urls)} businesses với {self.concurrent_tabs} tabs song song")
-            print(f"   💡 Multi-tab parallel processing...\n")
-            
-            # Process URLs in batches
-            batch_size = self.concurrent_tabs
-            total_processed = 0
-            
-            for batch_idx in range(0, len(urls), batch_size):
-                batch_urls = urls[batch_idx:batch_idx + batch_size]
-                batch_num = (batch_idx // batch_size) + 1
-                total_batches = (len(urls) + batch_size - 1) // batch_size
+            # Card nào trên feed đã đủ thông tin thì lấy luôn, bỏ qua detail page
+            if self.feed_complete_fields is not None:
+                cards = await page.evaluate(_FEED_CARDS_JS)
+                feed_businesses = {card['href']: _business_from_feed_card(card) for card in cards}
                 
-                print(f"   🔄 Batch {batch_num}/{total_batches}: Processing {len(batch_urls)} items in parallel...")
+                detail_urls = []
+                for url in urls:
+                    business = feed_businesses.get(url)
+                    if business and business['name'] and all(business.get(f) for f in self.feed_complete_fields):
+                        businesses.append(business)
+                        self._record(business, query)
+                    else:
+                        detail_urls.append(url)
                 
-                # Process batch in parallel
-                tasks = [
-                    self._extract_from_url(url, context, total_processed + i + 1, max_items)
-                    for i, url in enumerate(batch_urls)
-                ]
-                
-                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Collect successful results
-                for result in batch_results:
-                    if isinstance(result, dict) and result.get('name'):
-                        businesses.append(result)
-                    elif isinstance(result, Exception):
-                        print(f"      ⚠️ Error in batch: {result}")
-                
-                total_processed += len(batch_urls)
-                
-                # Delay between batches với random jitter (anti-detection)
-                if batch_idx + batch_size < len(urls):
-                    batch_delay = 1.5 + random.uniform(0, 1)
-                    await asyncio.sleep(batch_delay)
-                
-                print()
+                if businesses:
+                    logger.info(f"   ⚡ {len(businesses)} businesses lấy trực tiếp từ feed, bỏ qua detail page")
+                urls = detail_urls
+            
+            logger.info(f"   📝 Sẽ crawl {len(urls)} businesses với {self.concurrent_tabs} tabs song song")
+            logger.info(f"   💡 Multi-tab parallel processing...\n")
+            
+            # Tạo sẵn pool tabs, dùng chung cho mọi URL (nếu caller chưa tạo)
+            owns_pool = self._page_pool is None
+            if owns_pool:
+                await self._open_page_pool(context)
             
-            print(f"   ✅ Đã parse thành công {len(businesses)}/{max_items} kết quả")
+            # Chạy tất cả URLs cùng lúc; page pool giới hạn số tab hoạt động
+            # (như một semaphore), tab nào xong là nhận URL tiếp theo ngay
+            tasks = [
+                self._extract_from_url(url, context, i + 1, max_items, query)
+                for i, url in enumerate(urls)
+            ]
+            
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            
+            # Collect successful results
+            for result in results:
+                if isinstance(result, dict) and result.get('name'):
+                    businesses.append(result)
+                elif isinstance(result, Exception):
+                    logger.warning(f"      ⚠️ Error: {result}")
+            
+            logger.info("")
+            logger.info(f"   ✅ Đã parse thành công {len(businesses)}/{max_items} kết quả")
             return businesses
             
         except Exception as e:
-            print(f"   ❌ Lỗi khi parse: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"   ❌ Lỗi khi parse: {e}")
+            # Traceback chỉ được format khi bật DEBUG
+            logger.debug("Parse error", exc_info=True)
             return businesses
+        
+        finally:
+            if owns_pool:
+                await self._close_page_pool()
+    
+    async def _open_page_pool(self, context: BrowserContext) -> None:
+        """Tạo sẵn concurrent_tabs tabs để tái sử dụng cho mọi URL"""
+        self._page_pool = asyncio.Queue()
+        for _ in range(self.concurrent_tabs):
+            await self._page_pool.put(await context.new_page())
+        self._live_tabs = self.concurrent_tabs
+    
+    async def _close_page_pool(self) -> None:
+        """Đóng toàn bộ tabs trong pool (khi xong query)"""
+        if self._page_pool is None:
+            return
+        
+        while not self._page_pool.empty():
+            page = self._page_pool.get_nowait()
+            if page is not None and not page.is_closed():
+                await page.close()
+        self._page_pool = None
     
-    async def _extract_from_url(self, url: str, context: BrowserContext, index: int, total: int) -> Optional[Dict]:
+    @asynccontextmanager
+    async def _borrow_page(self, context: BrowserContext) -> AsyncIterator[Optional[Page]]:
+        """
+        Mượn 1 tab từ pool; khi thoát, tab được reset rồi trả lại pool
+        
+        Yield None (không chờ mãi) nếu có yêu cầu shutdown trong lúc chờ tab,
+        hoặc pool đã mất hết tab vì không tạo được tab thay thế (vd. user đóng browser).
         """
-        Mở URL trong tab mới và extract business info với retry logic
+        if self._page_pool is None:
+            await self._open_page_pool(context)
+        pool = self._page_pool
+        
+        getter = asyncio.ensure_future(pool.get())
+        if not await _run_unless_shutdown(getter):
+            yield None
+            return
+        
+        page = getter.result()
+        if page is None:
+            # Pool đã mất hết tab: trả lại marker để các task đang chờ khác cũng thoát
+            pool.put_nowait(None)
+            yield None
+            return
+        
+        try:
+            yield page
+        finally:
+            try:
+                await self._reset_page(page)
+                
+                # Tab bị crash/đóng thì thay bằng tab mới để pool giữ đủ số lượng
+                if page.is_closed():
+                    page = await context.new_page()
+            except Exception as e:
+                logger.warning(f"      ⚠️ Không tạo lại được tab: {type(e).__name__}")
+                logger.debug("Page pool error", exc_info=True)
+                self._live_tabs -= 1
+                # Hết tab dùng được thì đặt marker None để các task đang chờ không treo mãi
+                if self._live_tabs <= 0:
+                    pool.put_nowait(None)
+            else:
+                pool.put_nowait(page)
+    
+    async def _reset_page(self, page: Page) -> None:
+        """Đưa tab về about:blank để giải phóng state của Maps SPA (đóng tab nếu reset lỗi)"""
+        if page.is_closed():
+            return
+        
+        try:
+            await page.goto('about:blank', wait_until='commit')
+            await page.evaluate(
+                '() => window.performance && performance.clearResourceTimings && performance.clearResourceTimings()'
+            )
+        except Exception:
+            await page.close()
+    
+    async def _extract_from_url(
+        self,
+        url: str,
+        context: BrowserContext,
+        index: int,
+        total: int,
+        query: Optional[str] = None,
+    ) -> Optional[Dict]:
+        """
+        Mở URL trong một tab của pool và extract business info với retry logic
         
         Args:
             url: Business detail URL
             context: Browser context
             index: Current index for logging
             total: Total items for logging
+            query: Query đang crawl (truyền kèm record cho _on_record)
             
         Returns:
             Business info dict hoặc None
         """
-        page = None
+        # Business đã crawl ở query trước (cùng scraper) thì dùng lại
+        cache_key = url.split('?', 1)[0]
+        if cache_key in self._url_cache:
+            cached = self._url_cache[cache_key]
+            logger.info(f"      ♻️ [{index}/{total}] {cached['name'][:50]} (cache)")
+            # Vẫn ghi record để mỗi query có đủ kết quả của mình trong NDJSON
+            self._record(cached, query)
+            return cached
         
-        # Retry with exponential backoff
-        for attempt in range(self.max_retries):
-            try:
-                # Mở tab mới
-                page = await context.new_page()
-                
-                # Stagger tab opening với random jitter để tránh bị detect
-                base_delay = 0.05 * (index % self.concurrent_tabs)
-                jitter = random.uniform(0, 0.1)
-                await asyncio.sleep(base_delay + jitter)
-                
-                # Navigate với timeout tăng dần theo attempt
-                timeout = 30000 * (attempt + 1)
-                await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
-                
-                # Thay vì wait networkidle, wait cho selector quan trọng
+        _init_control_events()
+        if shutdown_event.is_set():
+            return None
+        
+        # Mượn tab từ pool, tự trả lại khi xong (kể cả khi lỗi)
+        async with self._borrow_page(context) as page:
+            if page is None:
+                return None
+            
+            # Small delay giữa các URL trên cùng tab (tránh request dồn dập)
+            await asyncio.sleep(0.5 + random.uniform(0, 0.3))
+            
+            # Retry with exponential backoff
+            for attempt in range(self.max_retries):
                 try:
-                    # Wait cho tên business xuất hiện
-                    await page.wait_for_selector('h1', timeout=8000)
-                except:
-                    # Nếu không có h1, vẫn thử extract
-                    pass
-                
-                # Thêm delay nhỏ với random jitter để panel load đầy đủ
-                await asyncio.sleep(1 + random.uniform(0, 0.3))
-                
-                # Extract info
-                business_info = await self._extract_from_detail_panel(page)
-                
-                if business_info and business_info.get('name'):
-                    print(f"      ✓ [{index}/{total}] {business_info['name'][:50]}")
-                    if business_info.get('phone'):
-                        print(f"          📞 {business_info['phone']}")
-                else:
-                    print(f"      ⚠️ [{index}/{total}] Không lấy được thông tin")
-                
-                # Success - close page and return
-                await page.close()
-                return business_info
+                    # Navigate với timeout tăng dần theo attempt
+                    timeout = 30000 * (attempt + 1)
+                    # Dừng ngay khi có yêu cầu shutdown thay vì chờ trang load xong
+                    if not await _run_unless_shutdown(
+                        page.goto(url, wait_until="commit", timeout=timeout)
+                    ):
+                        return None
+                    
+                    # Thay vì wait networkidle/domcontentloaded, wait cho selector quan trọng
+                    try:
+                        # Wait cho tên business xuất hiện
+                        await page.wait_for_selector('h1', timeout=15000)
+                    except:
+                        # Nếu không có h1, vẫn thử extract
+                        pass
+                    
+                    # Chờ panel render ít nhất 1 thông tin (thay cho sleep cố định)
+                    try:
+                        await page.wait_for_selector(
+                            _PANEL_READY_SELECTOR, timeout=3000, state='attached'
+                        )
+                    except PlaywrightTimeoutError:
+                        pass
+                    
+                    # Extract info
+                    business_info = await self._extract_from_detail_panel(page)
+                    
+                    if business_info and business_info.get('name'):
+                        logger.info(f"      ✓ [{index}/{total}] {business_info['name'][:50]}")
+                        if business_info.get('phone'):
+                            logger.info(f"          📞 {business_info['phone']}")
+                        self._record(business_info, query)
+                        self._url_cache[cache_key] = business_info
+                    else:
+                        logger.warning(f"      ⚠️ [{index}/{total}] Không lấy được thông tin")
+                    
+                    return business_info
                 
-            except PlaywrightTimeoutError as e:
-                if page:
-                    await page.close()
-                    page = None
+                except PlaywrightTimeoutError as e:
+                    if attempt < self.max_retries - 1:
+                        # Reset tab về about:blank thay vì retry trên trang đang load dở
+                        await self._reset_page(page)
+                        if page.is_closed():
+                            return None
+                        
+                        # Exponential backoff before retry
+                        backoff = (2 ** attempt) + random.uniform(0, 1)
+                        logger.info(f"      🔄 [{index}/{total}] Timeout, đang retry sau {backoff:.1f}s...")
+                        await asyncio.sleep(backoff)
+                    else:
+                        logger.error(f"      ❌ [{index}/{total}] Lỗi: Timeout sau {self.max_retries} lần thử")
+                        return None
                 
-                if attempt < self.max_retries - 1:
-                    # Exponential backoff before retry
-                    backoff = (2 ** attempt) + random.uniform(0, 1)
-                    print(f"      🔄 [{index}/{total}] Timeout, đang retry sau {backoff:.1f}s...")
-                    await asyncio.sleep(backoff)
-                else:
-                    print(f"      ❌ [{index}/{total}] Lỗi: Timeout sau {self.max_retries} lần thử")
+                except Exception as e:
+                    logger.error(f"      ❌ [{index}/{total}] Lỗi: {type(e).__name__}: {str(e)[:50]}")
+                    logger.debug(f"Extract error: {url}", exc_info=True)
                     return None
-                    
-            except Exception as e:
-                if page:
-                    await page.close()
-                    page = None
-                    
-                print(f"      ❌ [{index}/{total}] Lỗi: {type(e).__name__}: {str(e)[:50]}")
-                return None
-        
+
         return None
     
     async def _extract_from_detail_panel(self, page: Page) -> Optional[Dict]:
         """
         Extract thông tin từ detail panel bên phải
         (Sau khi đã click vào một business)
+
+        Lần evaluate đầu chỉ đọc tên + các button data-item-id; chỉ khi còn
+        field trống mới chạy thêm 1 evaluate cho các cách fallback.
+        Phần parse (regex, lọc địa chỉ...) chạy ở phía Python.
         """
         try:
+            data = await page.evaluate(_DETAIL_PANEL_JS)
             
-            # Lấy tên - nhiều selector khác nhau
-            name = None
-            name_selectors = [
-                'h1.DUwDvf',  # Selector phổ biến nhất
-                'h1.fontHeadlineLarge',
-                'h1',
-                'div.fontHeadlineLarge span',
-                '[role="main"] h1',
-            ]
-            
-            for selector in name_selectors:
-                name_elem = await page.query_selector(selector)
-                if name_elem:
-                    name_text = await name_elem.inner_text()
-                    name_text = name_text.strip()
-                    if name_text and len(name_text) > 2:
-                        name = name_text
-                        break
-            
+            name = data.get('name')
             if not name:
                 return None
             
-            # Lấy số điện thoại - nhiều cách
-            phone = None
-            
-            # Cách 1: Tìm button có data-item-id chứa "phone"
-            phone_button = await page.query_selector('button[data-item-id*="phone"]')
-            if phone_button:
-                aria_label = await phone_button.get_attribute('aria-label') or ''
-                phone = self._extract_phone(aria_label)
+            # Cách 1 của mọi field: button có data-item-id
+            phone = _extract_phone_label(data['phoneAria']) if data.get('phoneAria') else None
             
-            # Cách 2: Tìm link tel:
-            if not phone:
-                tel_link = await page.query_selector('a[href^="tel:"]')
-                if tel_link:
-                    href = await tel_link.get_attribute('href') or ''
-                    phone = self._extract_phone(href)
-            
-            # Cách 3: Tìm trong aria-label có "Phone"
-            if not phone:
-                phone_buttons = await page.query_selector_all('button[aria-label*="Phone"], button[aria-label*="Điện thoại"]')
-                for btn in phone_buttons:
-                    aria_label = await btn.get_attribute('aria-label') or ''
-                    phone = self._extract_phone(aria_label)
-                    if phone:
-                        break
-            
-            # Cách 4: Tìm trong toàn bộ panel text
-            if not phone:
-                # Lấy text từ phần thông tin chi tiết
-                detail_sections = await page.query_selector_all('div.rogA2c')  # Sections chứa info
-                for section in detail_sections:
-                    text = await section.inner_text()
-                    phone = self._extract_phone(text)
-                    if phone:
-                        break
-            
-            # Lấy địa chỉ
             address = "Chưa có thông tin"
+            # Phần sau "Address:"/"Địa chỉ:" (tới marker kế tiếp nếu có)
+            parts = _ARIA_ADDR_RE.split(data.get('addrAria') or '', maxsplit=2)
+            if len(parts) > 1:
+                address = parts[1].strip()
             
-            # Cách 1: Từ button address
-            addr_button = await page.query_selector('button[data-item-id*="address"]')
-            if addr_button:
-                aria_label = await addr_button.get_attribute('aria-label') or ''
-                if 'Address:' in aria_label or 'Địa chỉ:' in aria_label:
-                    parts = aria_label.replace('Address:', '|').replace('Địa chỉ:', '|').split('|')
-                    if len(parts) > 1:
-                        address = parts[1].strip()
+            website = _extract_website(data['siteAria']) if data.get('siteAria') else None
+            opening_hours = _extract_opening_hours(data['hoursAria']) if data.get('hoursAria') else None
             
-            # Cách 2: Tìm trong div chứa địa chỉ (thường có class fontBodyMedium)
-            if address == "Chưa có thông tin":
-                addr_divs = await page.query_selector_all('div.fontBodyMedium')
-                for div in addr_divs:
-                    text = await div.inner_text()
-                    text = text.strip()
-                    # Địa chỉ thường có tên thành phố và dài hơn
-                    if any(city in text for city in ['Hà Nội', 'TP.HCM', 'Đà Nẵng', 'Cần Thơ', 'Hải Phòng', 'Việt Nam']):
-                        if len(text) > 15 and not any(x in text for x in ['★', 'đánh giá', 'rating', 'Mở cửa', 'Đóng cửa']):
+            # Các cách fallback - chỉ đọc DOM cho field còn thiếu
+            missing = {
+                'phone': not phone,
+                'address': address == "Chưa có thông tin",
+                'website': not website,
+                'hours': not opening_hours,
+            }
+            if any(missing.values()):
+                fallback = await page.evaluate(
+                    _DETAIL_FALLBACK_JS, {**missing, 'hoursPattern': _HOURS_IND_RE.pattern}
+                )
+                
+                # Số điện thoại: link tel:, aria-label có "Phone", text các section chi tiết
+                if not phone and fallback.get('tel'):
+                    phone = _extract_phone_label(fallback['tel'])
+                if not phone:
+                    for aria_label in fallback.get('phoneLabels', []):
+                        phone = _extract_phone_label(aria_label)
+                        if phone:
+                            break
+                if not phone and fallback.get('sectionText'):
+                    phone = _extract_phone(fallback['sectionText'])
+                
+                # Địa chỉ: div fontBodyMedium có tên thành phố, rồi toàn bộ panel
+                if missing['address']:
+                    for text in fallback.get('bodyTexts', []):
+                        text = text.strip()
+                        # Địa chỉ thường có tên thành phố và dài hơn
+                        if len(text) > 15 and _CITY_RE.search(text) and not _ADDR_BLOCK_RE.search(text):
                             address = text
                             break
-            
-            # Cách 3: Fallback - tìm trong toàn bộ panel
-            if address == "Chưa có thông tin":
-                panel_elem = await page.query_selector('[role="main"]')
-                if panel_elem:
-                    panel_text = await panel_elem.inner_text()
-                    address = self._extract_address_from_text(panel_text)
-            
-            # Lấy website
-            website = None
-            
-            # Cách 1: Tìm button có data-item-id chứa "authority" hoặc "website"
-            website_button = await page.query_selector('button[data-item-id*="authority"], button[data-item-id*="website"]')
-            if website_button:
-                aria_label = await website_button.get_attribute('aria-label') or ''
-                # Extract URL từ aria-label
-                website = self._extract_website(aria_label)
-            
-            # Cách 2: Tìm link có href bắt đầu bằng http
-            if not website:
-                # Tìm trong panel chính, tránh các link internal của Google Maps
-                panel_elem = await page.query_selector('[role="main"]')
-                if panel_elem:
-                    website_links = await panel_elem.query_selector_all('a[href^="http"]')
-                    for link in website_links:
-                        href = await link.get_attribute('href') or ''
-                        # Loại bỏ các link của Google
+                    
+                    if address == "Chưa có thông tin" and fallback.get('panelText'):
+                        address = _extract_address_from_text(fallback['panelText'])
+                
+                # Website: link http trong panel chính, bỏ các link của Google
+                if not website:
+                    for href in fallback.get('links', []):
                         if 'google.com' not in href and 'gstatic.com' not in href:
                             website = href
                             break
-            
-            # Lấy thời gian hoạt động (opening hours)
-            opening_hours = None
-            
-            # Cách 1: Tìm button có data-item-id chứa "hours"
-            hours_button = await page.query_selector('button[data-item-id*="hours"]')
-            if hours_button:
-                aria_label = await hours_button.get_attribute('aria-label') or ''
-                opening_hours = self._extract_opening_hours(aria_label)
-            
-            # Cách 2: Tìm trong các div chứa thông tin giờ mở cửa
-            if not opening_hours:
-                # Tìm text có chứa "Open", "Closes", "Mở cửa", "Đóng cửa"
-                hours_indicators = ['Open', 'Closes', 'Opens', 'Mở cửa', 'Đóng cửa', '24 hours', '24 giờ']
-                all_divs = await page.query_selector_all('div.fontBodyMedium, div.fontBodySmall')
-                for div in all_divs:
-                    text = await div.inner_text()
-                    text = text.strip()
-                    if any(indicator in text for indicator in hours_indicators):
-                        # Tìm thêm context xung quanh để lấy đầy đủ thông tin
-                        parent = await div.evaluate_handle('el => el.parentElement')
-                        if parent:
-                            hours_text = await parent.as_element().inner_text()
-                            hours_text = hours_text.strip()
-                            if len(hours_text) > 3:
-                                opening_hours = hours_text
-                                break
+                
+                # Giờ mở cửa: parent div chứa "Open", "Mở cửa"... (đã lọc trong JS)
+                if not opening_hours and fallback.get('hoursText'):
+                    opening_hours = fallback['hoursText']
             
             return {
                 "name": name,
@@ -891,96 +1643,9 @@ class GoogleMapsScraper:
             }
             
         except Exception as e:
-            print(f"         Lỗi extract detail: {e}")
+            logger.warning(f"         Lỗi extract detail: {e}")
             return None
     
-    def _extract_address_from_text(self, text: str) -> str:
-        """Extract địa chỉ từ một đoạn text dài"""
-        lines = text.split('\n')
-        cities = ['Hà Nội', 'TP.HCM', 'TP HCM', 'Sài Gòn', 'Đà Nẵng', 'Cần Thơ', 'Hải Phòng', 'Việt Nam']
-        
-        for line in lines:
-            line = line.strip()
-            # Tìm dòng chứa tên thành phố và đủ dài
-            for city in cities:
-                if city in line and len(line) > 15:
-                    # Loại bỏ các prefix không cần thiết
-                    if ':' in line:
-                        line = line.split(':', 1)[1].strip()
-                    return line
-        
-        return "Chưa có thông tin"
-    
-    def _extract_website(self, text: str) -> Optional[str]:
-        """Trích xuất website URL từ text"""
-        # Pattern cho URL
-        url_pattern = r'https?://[^\s\"\',<>]+'
-        matches = re.findall(url_pattern, text)
-        
-        if matches:
-            url = matches[0]
-            # Loại bỏ các URL của Google
-            if 'google.com' not in url and 'gstatic.com' not in url:
-                return url
-        
-        # Nếu không tìm thấy http://, thử tìm domain pattern
-        domain_pattern = r'(?:www\.)?[a-zA-Z0-9-]+\.[a-zA-Z]{2,}(?:\.[a-zA-Z]{2,})?'
-        domain_matches = re.findall(domain_pattern, text)
-        
-        if domain_matches:
-            domain = domain_matches[0]
-            # Thêm https:// nếu chưa có
-            if not domain.startswith(('http://', 'https://')):
-                return f'https://{domain}'
-            return domain
-        
-        return None
-    
-    def _extract_opening_hours(self, text: str) -> Optional[str]:
-        """Trích xuất thông tin giờ mở cửa từ text"""
-        # Làm sạch aria-label
-        # Thường có format: "Hours: Open ⋅ Closes 5 PM" hoặc "Giờ: Mở cửa ⋅ Đóng cửa 17:00"
-        
-        # Loại bỏ các prefix như "Hours:", "Giờ:", etc.
-        cleaned = text
-        for prefix in ['Hours:', 'Giờ:', 'Opening hours:', 'Thời gian mở cửa:']:
-            if prefix in cleaned:
-                cleaned = cleaned.split(prefix, 1)[1].strip()
-        
-        # Nếu có nội dung hợp lệ
-        if len(cleaned) > 3:
-            # Làm sạch thêm các ký tự đặc biệt
-            cleaned = cleaned.replace('⋅', '•').strip()
-            return cleaned
-        
-        return None
-    
-    def _extract_phone(self, text: str) -> Optional[str]:
-        """Trích xuất số điện thoại từ text"""
-        # Pattern cho số điện thoại Việt Nam
-        patterns = [
-            r'(?:\+84|84|0)[\s.-]?\d{1,4}[\s.-]?\d{3}[\s.-]?\d{3,4}',
-            r'(?:\+84|84|0)\d{9,10}',
-            r'\b\d{10,11}\b',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                # Làm sạch
-                phone = re.sub(r'[^\d+]', '', matches[0])
-                
-                # Chuẩn hóa
-                if phone.startswith('+84'):
-                    phone = '0' + phone[3:]
-                elif phone.startswith('84'):
-                    phone = '0' + phone[2:]
-                
-                if 10 <= len(phone) <= 11:
-                    return phone
-        
-        return None
-    
     async def run_searches(self, queries: List[str], delay: float = 3.0) -> Dict[str, List[Dict]]:
         """
         Chạy nhiều query search trên Maps
@@ -991,143 +1656,191 @@ class GoogleMapsScraper:
             
         Returns:
             Dict với key là query, value là list kết quả
+            
+        Tối đa query_concurrency query chạy song song, mỗi query một tab
+        search riêng; detail pages dùng chung page pool.
+            
+        Mỗi business được ghi ngay vào file NDJSON (self.raw_records_path),
+        kèm field "query", khi extract xong, nên crash giữa chừng vẫn giữ được
+        dữ liệu (đọc lại theo query bằng load_raw_records).
         """
         all_results = {}
         
-        async with async_playwright() as p:
-            print("🌐 Đang khởi động browser...")
-            
-            # Launch với args tương tự batdongsan_final.py
-            browser = await p.chromium.launch(
-                headless=self.headless,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-web-security',
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                ]
-            )
-            
-            # Context options
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={"width": 1920, "height": 1080},
-                locale="vi-VN",
-                timezone_id="Asia/Ho_Chi_Minh",
-            )
+        # 💾 Stream từng record ra NDJSON để tránh mất data khi crash
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.raw_records_path = Path(f"{timestamp}_raw.ndjson")
+        raw_file = open(self.raw_records_path, 'wb')
+        
+        def write_record(business: Dict, query: Optional[str]) -> None:
+            raw_file.write(_json_dumps_bytes({'query': query, **business}) + b'\n')
+            raw_file.flush()
+        
+        self._on_record = write_record
+        logger.info(f"💾 Ghi kết quả thô vào: {self.raw_records_path}")
+        
+        # Dùng lại browser của `async with` nếu có, không thì tự mở/đóng trong lần chạy này
+        owns_browser = self._context is None
+        try:
+            if owns_browser:
+                await self.__aenter__()
+            context = self._context
             
-            page = await context.new_page()
+            query_slots = asyncio.Semaphore(self.query_concurrency)
             
-            try:
-                for i, query in enumerate(queries, 1):
-                    print(f"\n🔍 [{i}/{len(queries)}] Đang search: {query}")
-                    
-                    # Search trên Maps với context for multi-tab
-                    businesses = await self.search_google_maps(query, page, context)
+            async def run_one(i: int, query: str) -> List[Dict]:
+                async with query_slots:
+                    logger.info(f"\n🔍 [{i}/{len(queries)}] Đang search: {query}")
                     
-                    all_results[query] = businesses
-                    print(f"   ✅ Tổng cộng: {len(businesses)} kết quả\n")
+                    # Mỗi query có tab search riêng (mở/đóng trong search_google_maps), detail pages lấy từ pool
+                    businesses = await self.search_google_maps(query, context=context)
                     
-                    # 💾 Incremental save để tránh mất data khi crash
-                    temp_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    temp_file = f"temp_incremental_{temp_timestamp}.json"
-                    
-                    try:
-                        with open(temp_file, 'w', encoding='utf-8') as f:
-                            json.dump(all_results, f, ensure_ascii=False, indent=2)
-                        print(f"   💾 Đã lưu tạm: {temp_file}")
-                    except Exception as e:
-                        print(f"   ⚠️ Không thể lưu tạm: {e}")
+                    logger.info(f"   ✅ [{query}] Tổng cộng: {len(businesses)} kết quả\n")
                     
-                    # Delay với random jitter
+                    # Delay (giảm một nửa vì đã chạy song song) với random jitter trước khi nhả slot
                     if i < len(queries):
-                        delay_time = delay + random.uniform(0, 2)
-                        print(f"   ⏳ Chờ {delay_time:.1f}s trước query tiếp theo...")
+                        delay_time = delay / 2 + random.uniform(0, 1)
                         await asyncio.sleep(delay_time)
+                    
+                    return businesses
             
-            finally:
-                await browser.close()
+            results = await asyncio.gather(*(run_one(i, q) for i, q in enumerate(queries, 1)))
+            all_results = dict(zip(queries, results))
+        
+        finally:
+            if owns_browser:
+                await self.__aexit__(None, None, None)
+            self._on_record = None
+            raw_file.close()
         
         return all_results
 
 
-def save_results(results: Dict[str, List[Dict]], output_file: str, timestamp: str = "", chunk_size: int = 1000):
+def read_ndjson(path: Path) -> Iterator[Dict]:
+    """Đọc lần lượt từng record từ file NDJSON (bỏ qua dòng trống/dòng ghi dở)"""
+    with open(path, 'rb') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield _json_loads(line)
+            except ValueError:
+                # Dòng cuối có thể bị cắt ngang nếu crash khi đang ghi
+                continue
+
+
+def load_raw_records(path: Path) -> Dict[str, List[Dict]]:
+    """Dựng lại kết quả dạng {query: [business, ...]} từ NDJSON của run_searches (vd. sau crash)"""
+    grouped: Dict[str, List[Dict]] = {}
+    for record in read_ndjson(path):
+        query = record.pop('query', None) or ''
+        grouped.setdefault(query, []).append(record)
+    return grouped
+
+
+def save_results(
+    results: Union[Dict[str, List[Dict]], Path, List[Dict]],
+    output_file: str,
+    timestamp: str = "",
+    chunk_size: int = 1000,
+):
     """Lưu kết quả vào JSON files với timestamp prefix
     Tự động chia thành nhiều files nếu > chunk_size records
     
     Args:
-        results: Kết quả scraping
+        results: Kết quả scraping, path tới file NDJSON của run_searches, hoặc
+            list đã loại trùng (GoogleMapsScraper.unique_results, ghi thẳng không dedupe lại)
         output_file: Tên file gốc
         timestamp: Timestamp để thêm vào prefix (format: YYYYMMDD_HHMMSS)
         chunk_size: Số records tối đa mỗi file (default: 1000)
     """
-    # Gộp và loại trùng
-    all_businesses = []
-    seen_names = set()
+    already_unique = isinstance(results, list)
+    if already_unique:
+        records: Iterator[Dict] = iter(results)
+    elif isinstance(results, Path):
+        def ndjson_records() -> Iterator[Dict]:
+            """Record NDJSON kèm key 'query' (như load_raw_records): bỏ đi để output giống input dict/list"""
+            for record in read_ndjson(results):
+                record.pop('query', None)
+                yield record
+        
+        records = ndjson_records()
+    else:
+        records = (business for businesses in results.values() for business in businesses)
     
-    for query, businesses in results.items():
-        for business in businesses:
-            name = business.get("name", "")
-            
-            # Loại trùng theo tên
-            if name and name not in seen_names:
-                seen_names.add(name)
-                all_businesses.append(business)
+    # Tách tên file 1 lần, mỗi chunk chỉ ghép lại
+    stem, dot, ext = output_file.rpartition('.')
+    if not dot:
+        stem, ext = output_file, ''
+    prefix = f"{timestamp}_{stem}" if timestamp else stem
+    ext = dot + ext
     
-    total_records = len(all_businesses)
+    def make_filename(part: Optional[int] = None) -> str:
+        """Tên file output, thêm _partNNN khi chia nhiều files"""
+        return f"{prefix}_part{part:03d}{ext}" if part else f"{prefix}{ext}"
     
-    # Tính số files cần thiết
-    num_files = (total_records + chunk_size - 1) // chunk_size
+    item_sep = b',\n' if JSON_PRETTY else b','
     
-    print(f"\n💾 Tổng cộng {total_records} doanh nghiệp")
+    # Stream thẳng từng record ra chunk file: không giữ toàn bộ kết quả trong RAM.
+    # Chunk đầu ghi vào tên file đơn; nếu cần chunk thứ 2 thì đổi tên thành _part001.
+    seen_names = set()
+    chunk_files: List[Tuple[str, int]] = []  # (filename, số records)
+    f = None
+    total_records = 0
     
-    if num_files == 1:
-        # Chỉ 1 file, lưu bình thường
-        if timestamp:
-            if '.' in output_file:
-                name_parts = output_file.rsplit('.', 1)
-                final_filename = f"{timestamp}_{name_parts[0]}.{name_parts[1]}"
-            else:
-                final_filename = f"{timestamp}_{output_file}"
-        else:
-            final_filename = output_file
-        
-        with open(final_filename, 'w', encoding='utf-8') as f:
-            json.dump(all_businesses, f, ensure_ascii=False, indent=2)
-        
-        print(f"✅ Đã lưu vào: {final_filename}")
-    else:
-        # Nhiều files, chia thành chunks
-        print(f"📦 Sẽ chia thành {num_files} files ({chunk_size} records/file)")
-        
-        for i in range(num_files):
-            start_idx = i * chunk_size
-            end_idx = min((i + 1) * chunk_size, total_records)
-            chunk_data = all_businesses[start_idx:end_idx]
+    try:
+        for business in records:
+            # Loại trùng theo tên (list từ unique_results đã được dedupe khi crawl)
+            if not already_unique:
+                name = business.get("name")
+                if not name or name in seen_names:
+                    continue
+                seen_names.add(name)
             
-            # Tạo tên file với số thứ tự
-            if timestamp:
-                if '.' in output_file:
-                    name_parts = output_file.rsplit('.', 1)
-                    chunk_filename = f"{timestamp}_{name_parts[0]}_part{i+1:03d}.{name_parts[1]}"
-                else:
-                    chunk_filename = f"{timestamp}_{output_file}_part{i+1:03d}"
+            if total_records % chunk_size == 0:
+                if f is not None:
+                    f.write(b']')
+                    f.close()
+                
+                if len(chunk_files) == 1:
+                    first_part = make_filename(1)
+                    os.replace(chunk_files[0][0], first_part)
+                    chunk_files[0] = (first_part, chunk_files[0][1])
+                
+                filename = make_filename(len(chunk_files) + 1) if chunk_files else make_filename()
+                chunk_files.append((filename, 0))
+                f = open(filename, 'wb')
+                f.write(b'[')
             else:
-                if '.' in output_file:
-                    name_parts = output_file.rsplit('.', 1)
-                    chunk_filename = f"{name_parts[0]}_part{i+1:03d}.{name_parts[1]}"
-                else:
-                    chunk_filename = f"{output_file}_part{i+1:03d}"
-            
-            with open(chunk_filename, 'w', encoding='utf-8') as f:
-                json.dump(chunk_data, f, ensure_ascii=False, indent=2)
+                f.write(item_sep)
             
-            print(f"   ✓ Part {i+1}/{num_files}: {chunk_filename} ({len(chunk_data)} records)")
+            f.write(_json_dumps_bytes(business, JSON_PRETTY))
+            chunk_files[-1] = (chunk_files[-1][0], chunk_files[-1][1] + 1)
+            total_records += 1
+        
+        if f is None:
+            # Không có record nào: vẫn tạo file rỗng như 1 file output bình thường
+            chunk_files.append((make_filename(), 0))
+            f = open(chunk_files[0][0], 'wb')
+            f.write(b'[')
+        f.write(b']')
+    finally:
+        if f is not None:
+            f.close()
+    
+    print(f"\n💾 Tổng cộng {total_records} doanh nghiệp")
+    
+    num_files = len(chunk_files)
+    if num_files == 1:
+        print(f"✅ Đã lưu vào: {chunk_files[0][0]}")
+    else:
+        print(f"📦 Đã chia thành {num_files} files ({chunk_size} records/file)")
+        for i, (chunk_filename, count) in enumerate(chunk_files, 1):
+            print(f"   ✓ Part {i}/{num_files}: {chunk_filename} ({count} records)")
         
         print(f"\n✅ Đã chia và lưu thành {num_files} files")
 
 
-
 # ===== Các hàm helper để nhập query =====
 
 def get_queries_from_args():
@@ -1252,7 +1965,7 @@ def get_queries_interactive() -> List[str]:
 async def main():
     """Hàm chính với hỗ trợ resume và graceful shutdown"""
     import sys
-    global shutdown_requested, pause_requested, save_requested
+    global save_requested
     
     # ============== CẤU HÌNH (Conservative - An toàn) ==============
     HEADLESS = False  # False = hiện browser để xem process
@@ -1262,10 +1975,13 @@ async def main():
     # ===============================================================
     
     # Setup signal handlers for graceful shutdown
+    loop = asyncio.get_running_loop()
+    _init_control_events()
+    
     def signal_handler(signum: int, frame) -> None:
-        global shutdown_requested
         print("\n\n🛑 Đang dừng crawl... Lưu dữ liệu hiện tại...")
-        shutdown_requested = True
+        # Signal handler chạy ngoài event loop: set Event qua loop cho an toàn
+        loop.call_soon_threadsafe(shutdown_event.set)
     
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
@@ -1347,82 +2063,64 @@ async def main():
     keyboard_controller = KeyboardController()
     
     # Khởi tạo scraper
-    scraper = GoogleMapsScraper(headless=HEADLESS, concurrent_tabs=CONCURRENT_TABS)
+    # CLI không dùng persistent profile: nhiều lần chạy song song không đụng khoá profile
+    scraper = GoogleMapsScraper(headless=HEADLESS, concurrent_tabs=CONCURRENT_TABS, profile_dir=None)
     
     # Start keyboard listener
-    loop = asyncio.get_event_loop()
     keyboard_controller.start(loop)
     
     all_results_by_query: Dict[str, List[Dict[str, str]]] = {}
 
-    # Process each query separately for better resume support
-    for query_idx, query in enumerate(queries, 1):
-        if shutdown_requested:
-            print("\n🛑 Đã dừng theo yêu cầu người dùng")
-            break
-        
-        filename = sanitize_query_to_filename(query)
-        print(f"\n{'='*60}")
-        print(f"🔍 [{query_idx}/{len(queries)}] Query: {query}")
-        print(f"   📁 Filename: {filename}")
-        print(f"{'='*60}")
-        
-        # Check for existing state
-        existing_state = CrawlState.find_existing(query)
-        state: CrawlState
-        
-        if existing_state and not existing_state.completed:
-            print(f"\n📥 Tìm thấy state trước đó:")
-            print(f"   • Đã crawl: {len(existing_state.results)} kết quả")
-            print(f"   • Vị trí: {existing_state.current_index}/{len(existing_state.urls)}")
-            print(f"   • Cập nhật: {existing_state.last_updated}")
+    # Browser + context + tab pool khởi động 1 lần cho toàn bộ queries
+    async with scraper:
+        # Process each query separately for better resume support
+        for query_idx, query in enumerate(queries, 1):
+            if shutdown_event.is_set():
+                print("\n🛑 Đã dừng theo yêu cầu người dùng")
+                break
             
-            resume_choice = input("\n   Tiếp tục từ vị trí dừng? (y/n, Enter=y): ").lower().strip()
-            if resume_choice in ['', 'y', 'yes']:
-                state = existing_state
-                print(f"   ✅ Tiếp tục từ index {state.current_index}")
-            else:
-                print("   🔄 Bắt đầu lại từ đầu")
-                state = CrawlState(query=query, filename=filename)
-        else:
-            state = CrawlState(query=query, filename=filename)
-        
-        # Run the crawl
-        async with async_playwright() as p:
-            print("\n🌐 Đang khởi động browser...")
+            filename = sanitize_query_to_filename(query)
+            print(f"\n{'='*60}")
+            print(f"🔍 [{query_idx}/{len(queries)}] Query: {query}")
+            print(f"   📁 Filename: {filename}")
+            print(f"{'='*60}")
             
-            browser = await p.chromium.launch(
-                headless=HEADLESS,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-web-security',
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                ]
-            )
+            # Check for existing state
+            existing_state = CrawlState.find_existing(query)
+            state: CrawlState
             
-            context = await browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={"width": 1920, "height": 1080},
-                locale="vi-VN",
-                timezone_id="Asia/Ho_Chi_Minh",
-            )
+            if existing_state and not existing_state.completed:
+                print(f"\n📥 Tìm thấy state trước đó:")
+                print(f"   • Đã crawl: {len(existing_state.results)} kết quả")
+                print(f"   • Vị trí: {existing_state.current_index}/{len(existing_state.urls)}")
+                print(f"   • Cập nhật: {existing_state.last_updated}")
+                
+                with keyboard_controller.suspended():
+                    resume_choice = input("\n   Tiếp tục từ vị trí dừng? (y/n, Enter=y): ").lower().strip()
+                if resume_choice in ['', 'y', 'yes']:
+                    state = existing_state
+                    print(f"   ✅ Tiếp tục từ index {state.current_index}")
+                else:
+                    print("   🔄 Bắt đầu lại từ đầu")
+                    state = CrawlState(query=query, filename=filename)
+            else:
+                state = CrawlState(query=query, filename=filename)
             
+            # Run the crawl: browser/context/tab pool của scraper dùng chung cho mọi query,
+            # mỗi query chỉ mở 1 tab search riêng
+            context = scraper._context
             page = await context.new_page()
             
             try:
                 # If we don't have URLs yet, search for them
                 if not state.urls:
                     print("   🗺️  Đang tìm kiếm trên Google Maps...")
-                    from urllib.parse import quote_plus
+                    maps_url = maps_search_url(query)
                     
-                    encoded_query = quote_plus(query)
-                    maps_url = f"https://www.google.com/maps/search/{encoded_query}"
-                    
-                    await page.goto(maps_url, wait_until="domcontentloaded", timeout=60000)
+                    await page.goto(maps_url, wait_until="commit", timeout=60000)
                     
                     try:
-                        await page.wait_for_selector('div[role="feed"]', timeout=10000)
+                        await page.wait_for_selector('div[role="feed"]', timeout=20000)
                     except:
                         print("   ⚠️ Không tìm thấy danh sách kết quả")
                         continue
@@ -1430,18 +2128,16 @@ async def main():
                     # Scroll to load all results
                     await scraper._scroll_to_load_all(page)
                     
-                    # Get all URLs
-                    items = await page.query_selector_all('a.hfpxzc')
-                    if not items:
-                        items = await page.query_selector_all('a[href*="/maps/place/"]')
+                    # Get all URLs (1 round-trip)
+                    found = await page.evaluate(_PLACE_HREFS_JS, list(_PLACE_LINK_SELECTORS))
                     
                     urls = []
-                    for item in items:
-                        href = await item.get_attribute('href')
-                        if href and '/maps/place/' in href:
+                    seen = set()
+                    for href in found['hrefs']:
+                        if href and '/maps/place/' in href and href not in seen:  # Remove duplicates
+                            seen.add(href)
                             urls.append(href)
                     
-                    urls = list(dict.fromkeys(urls))  # Remove duplicates
                     state.urls = urls
                     state.save()
                     
@@ -1453,86 +2149,107 @@ async def main():
                 
                 print(f"\n   📝 Đang crawl từ index {start_index + 1}/{total_urls}...")
                 
-                for idx in range(start_index, total_urls):
-                    # Check for pause
-                    while pause_requested and not shutdown_requested:
-                        await asyncio.sleep(0.5)
-                    
-                    if shutdown_requested:
-                        print("\n   🛑 Đang lưu state và thoát...")
-                        state.save()
-                        break
-                    
-                    # Check for manual save request
-                    if save_requested:
-                        state.save()
-                        print(f"\n   💾 Manual save: {len(state.results)} kết quả")
-                        save_requested = False
-                    
-                    url = state.urls[idx]
-                    
-                    # Extract business info
-                    result = await scraper._extract_from_url(url, context, idx + 1, total_urls)
-                    
-                    if result and result.get('name'):
-                        state.results.append(result)
-                    
-                    state.current_index = idx + 1
-                    
-                    # Save state periodically
-                    if (idx + 1) % BATCH_SAVE_INTERVAL == 0:
-                        state.save()
-                        print(f"\n   💾 Đã lưu state ({len(state.results)} kết quả)")
-                    
-                    # Small delay
-                    await asyncio.sleep(0.5 + random.uniform(0, 0.3))
+                # CONCURRENT_TABS URL chạy song song (khớp số tab trong page pool)
+                slots = asyncio.Semaphore(CONCURRENT_TABS)
+                
+                async def crawl_one(idx: int) -> Tuple[int, bool, Optional[Dict]]:
+                    """Trả về (idx, đã crawl hay bị bỏ qua do shutdown, result)"""
+                    async with slots:
+                        # Check for pause
+                        await _wait_if_paused()
+                        if shutdown_event.is_set():
+                            return idx, False, None
+                        
+                        # Extract business info (delay giữa các URL nằm trong _extract_from_url)
+                        result = await scraper._extract_from_url(state.urls[idx], context, idx + 1, total_urls)
+                        # Bị huỷ giữa chừng do shutdown thì coi như chưa crawl (resume sẽ crawl lại)
+                        crawled = result is not None or not shutdown_event.is_set()
+                        return idx, crawled, result
+                
+                # URL xong không theo thứ tự: chỉ tiến current_index (và ghi results)
+                # qua đoạn liên tiếp đã xong, để resume không bỏ sót URL nào
+                finished: Dict[int, Optional[Dict]] = {}
+                tasks = [asyncio.ensure_future(crawl_one(idx)) for idx in range(start_index, total_urls)]
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        idx, crawled, result = await next_done
+                        if crawled:
+                            finished[idx] = result
+                        
+                        while state.current_index in finished:
+                            result = finished.pop(state.current_index)
+                            if result and result.get('name'):
+                                state.add_result(result)
+                            state.current_index += 1
+                            
+                            # Save state periodically
+                            if state.current_index % BATCH_SAVE_INTERVAL == 0:
+                                state.save()
+                                print(f"\n   💾 Đã lưu state ({len(state.results)} kết quả)")
+                        
+                        # Check for manual save request
+                        if save_requested:
+                            state.save()
+                            print(f"\n   💾 Manual save: {len(state.results)} kết quả")
+                            save_requested = False
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                
+                if shutdown_event.is_set():
+                    print("\n   🛑 Đang lưu state và thoát...")
+                    state.save()
                 
                 # Mark completed if finished all URLs
-                if state.current_index >= total_urls and not shutdown_requested:
-                    state.mark_completed()
+                if state.current_index >= total_urls and not shutdown_event.is_set():
+                    # mark_completed chờ state writer ghi xong: chờ trên thread riêng, không chặn event loop
+                    await asyncio.to_thread(state.mark_completed)
                     print(f"\n   ✅ Hoàn thành query: {len(state.results)} kết quả")
-                
+            
             except Exception as e:
                 print(f"\n   ❌ Lỗi: {type(e).__name__}: {e}")
                 state.save()  # Save on error
-                
+            
             finally:
-                await browser.close()
-        
-        # Track results by query for combined export
-        if state.results:
-            all_results_by_query[query] = state.results
+                await page.close()
 
-        # Save to Excel per query (if configured)
-        if save_mode == "per_query":
+            # Track results by query for combined export
             if state.results:
-                print(f"\n   📊 Exporting {len(state.results)} results to Excel...")
-                excel_path = save_to_excel(state.results, query)
-                if excel_path:
-                    print(f"   ✅ Excel exported: {excel_path}")
-                    if state.completed:
-                        state.delete_state_file()
-            else:
-                print("\n   ⚠️ Không có kết quả để export")
-        
-        # Delay before next query
-        if query_idx < len(queries) and not shutdown_requested:
-            delay_time = DELAY_BETWEEN_SEARCHES + random.uniform(0, 2)
-            print(f"\n   ⏳ Chờ {delay_time:.1f}s trước query tiếp theo...")
-            await asyncio.sleep(delay_time)
+                all_results_by_query[query] = state.results
+
+            # Save to Excel per query (if configured)
+            if save_mode == "per_query":
+                if state.results:
+                    print(f"\n   📊 Exporting {len(state.results)} results to Excel...")
+                    excel_path = await asyncio.to_thread(save_to_excel, state.results, query)
+                    if excel_path:
+                        print(f"   ✅ Excel exported: {excel_path}")
+                        if state.completed:
+                            state.delete_state_file()
+                else:
+                    print("\n   ⚠️ Không có kết quả để export")
+            
+            # Delay before next query
+            if query_idx < len(queries) and not shutdown_event.is_set():
+                delay_time = DELAY_BETWEEN_SEARCHES + random.uniform(0, 2)
+                print(f"\n   ⏳ Chờ {delay_time:.1f}s trước query tiếp theo...")
+                await asyncio.sleep(delay_time)
     
     # Stop keyboard listener
     keyboard_controller.stop()
     
+    # Chờ các state save đang chờ ghi xong
+    await asyncio.to_thread(CrawlState.flush)
+    
     # Combined export (if configured)
     if save_mode == "combined" and all_results_by_query:
         print(f"\n📊 Exporting combined results from {len(all_results_by_query)} queries...")
-        combined_path = save_combined_excel(all_results_by_query)
+        combined_path = await asyncio.to_thread(save_combined_excel, all_results_by_query)
         if combined_path:
             print(f"✅ Combined Excel exported: {combined_path}")
 
     print("\n" + "=" * 70)
-    if shutdown_requested:
+    if shutdown_event.is_set():
         print("🛑 ĐÃ DỪNG - Dữ liệu đã được lưu")
         print("   💡 Chạy lại script để tiếp tục từ vị trí dừng")
     else: